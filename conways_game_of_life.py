@@ -3,6 +3,14 @@ import numpy as np
 import scipy
 import json
 import time
+import argparse
+import os
+import sys
+import mmap
+try:
+    import resource # Only used to report peak RSS, not available on Windows
+except ImportError:
+    resource = None
 
 PRESET_PATTERNS = {
     "Still Lifes": {
@@ -30,13 +38,747 @@ PRESET_PATTERNS = {
     }
 }
 
+# Life-like rules in B/S notation. A trailing /C<n> selects a multi-state "Generations"
+# rule where live cells that fail to survive decay through n - 2 dying states.
+RULE_PRESETS = {
+    "Conway's Life": "B3/S23",
+    "HighLife": "B36/S23",
+    "Day & Night": "B3678/S34678",
+    "Seeds": "B2/S",
+    "Brian's Brain": "B2/S/C3",
+    "Star Wars": "B2/S345/C4",
+}
+DEFAULT_RULE = "B3/S23"
+ENGINES = ("dense", "adaptive", "lut")
+# Block lookup tables are cached here, one file per rule
+LUT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".conways_game_of_life")
+# Defaults for disk-backed boards
+TILE_SIZE = 1024
+TILE_MEMORY_BUDGET = 256 * 2**20
+
+class LifeRule:
+    def __init__(self, rule_string):
+        if isinstance(rule_string, str): # Non-strings are rejected by parse()
+            rule_string = RULE_PRESETS.get(rule_string, rule_string) # Allow preset names as well as notation
+        self.birth, self.survive, self.num_states = self.parse(rule_string)
+        self.rule_string = self.format()
+        # Transition table indexed by (current state, live neighbor count) -> next state
+        self.table = self.build_table()
+
+    @staticmethod
+    def parse(rule_string):
+        if not isinstance(rule_string, str) or not rule_string.strip():
+            raise ValueError(f"Invalid rule {rule_string!r}: expected a string like 'B3/S23'.")
+
+        birth, survive, num_states = None, None, None
+        for part in rule_string.strip().upper().split("/"):
+            part = part.strip()
+            prefix, value = part[:1], part[1:]
+            if prefix in ("B", "S"):
+                if not all(ch in "012345678" for ch in value):
+                    raise ValueError(f"Invalid rule {rule_string!r}: neighbor counts must be digits 0-8 in '{part}'.")
+                counts = frozenset(int(ch) for ch in value)
+                if prefix == "B" and birth is None:
+                    birth = counts
+                elif prefix == "S" and survive is None:
+                    survive = counts
+                else:
+                    raise ValueError(f"Invalid rule {rule_string!r}: '{prefix}' given more than once.")
+            elif prefix in ("C", "G") and value.isdigit():
+                if num_states is not None:
+                    raise ValueError(f"Invalid rule {rule_string!r}: number of states given more than once.")
+                num_states = int(value)
+                if num_states < 2:
+                    raise ValueError(f"Invalid rule {rule_string!r}: Generations rules need at least 2 states.")
+            else:
+                raise ValueError(f"Invalid rule {rule_string!r}: unrecognised part '{part}'.")
+
+        if birth is None or survive is None:
+            raise ValueError(f"Invalid rule {rule_string!r}: both B and S parts are required.")
+        return birth, survive, num_states if num_states is not None else 2
+
+    def format(self):
+        rule_string = "B" + "".join(str(n) for n in sorted(self.birth)) + "/S" + "".join(str(n) for n in sorted(self.survive))
+        if self.num_states > 2:
+            rule_string += f"/C{self.num_states}"
+        return rule_string
+
+    def build_table(self):
+        table = np.zeros((self.num_states, 9), dtype=int)
+        # Live cells that don't survive start decaying (state 2) in Generations rules, otherwise they die
+        decay_state = 2 if self.num_states > 2 else 0
+        for num_neighbors in range(9):
+            table[0, num_neighbors] = 1 if num_neighbors in self.birth else 0
+            table[1, num_neighbors] = 1 if num_neighbors in self.survive else decay_state
+        # Dying cells advance one state per generation regardless of neighbors, then become dead
+        for state in range(2, self.num_states):
+            table[state, :] = state + 1 if state + 1 < self.num_states else 0
+        return table
+
+    def count_neighbors(self, grid):
+        # Use convolution to efficiently calculate neighbor counts on the toroidal grid
+        kernel = np.array([[1, 1, 1],
+                           [1, 0, 1],
+                           [1, 1, 1]], dtype=int)
+        # Only fully live cells (state 1) count as neighbors; dying Generations states don't
+        live_cells = grid if self.num_states == 2 else (grid == 1).astype(int)
+        return scipy.signal.convolve2d(live_cells, kernel, mode='same', boundary='wrap')
+
+    def apply(self, grid, neighbor_counts, cell_ages):
+        # Every rule is a single gather from the precomputed (state, neighbor count) table
+        new_grid = self.table[grid, neighbor_counts]
+        # Survivors age by one, newborns start at 1, everything else (dead or dying) is 0
+        new_cell_ages = np.where(new_grid == 1, np.where(grid == 1, cell_ages + 1, 1), 0)
+        return new_grid, new_cell_ages
+
+    def __repr__(self):
+        return f"LifeRule('{self.rule_string}')"
+
+def nonzero_cells(grid, cell_ages):
+    # Flat indices, states and ages of the non-zero cells of a dense board, in the same form
+    # the adaptive engine keeps its sparse representation
+    flat_grid = grid.ravel()
+    cell_indices = np.flatnonzero(flat_grid)
+    return cell_indices, flat_grid[cell_indices], cell_ages.ravel()[cell_indices]
+
+# Density (non-zero cells / board cells) at which a sparse step costs the same as a dense step.
+# Measured with measure_crossover_density() along an Acorn lifecycle on the default 274x308 board
+# (extrapolated, Acorn peaks around 1.5% there); it grows with board size and varies with hardware.
+SPARSE_DENSE_CROSSOVER = 0.055
+# Relative band around the crossover inside which the engine keeps its current representation
+SPARSE_DENSE_HYSTERESIS = 0.25
+
+# Stepping backend that keeps a sparse list of non-zero cells while the board is nearly empty
+# and switches to the dense convolution when the population grows past the crossover density.
+class AdaptiveEngine:
+    # The 8 Moore neighbors as (row, col) deltas
+    NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+    def __init__(self, rule, rows, cols, crossover_density=SPARSE_DENSE_CROSSOVER, hysteresis=SPARSE_DENSE_HYSTERESIS):
+        self.rule = rule
+        self.ROWS, self.COLS = rows, cols
+        self.num_cells = rows * cols
+        self.crossover_density = crossover_density
+        self.dense_threshold = crossover_density * (1 + hysteresis)
+        self.sparse_threshold = crossover_density * (1 - hysteresis)
+        self.mode = None
+        self.switch_count = 0
+        # Dense representation
+        self.grid = None
+        self.cell_ages = None
+        # Sparse representation: sorted flat indices of non-zero cells with their states and ages
+        self.cell_indices = None
+        self.cell_states = None
+        self.sparse_ages = None
+
+    def load(self, grid, cell_ages):
+        # Take over a board that was edited outside the engine. The first load picks the representation
+        # by the crossover density, later loads keep the current one and leave switching to step().
+        # The arrays are adopted without copying; stepping never modifies them in place.
+        if self.mode is None:
+            use_dense = np.count_nonzero(grid) / self.num_cells >= self.crossover_density
+        else:
+            use_dense = self.mode == 'dense'
+        if use_dense or self.rule_needs_dense():
+            self.mode = 'dense'
+            self.grid, self.cell_ages = grid, cell_ages
+            self.cell_indices = self.cell_states = self.sparse_ages = None
+        else:
+            self.mode = 'sparse'
+            self.to_sparse(grid, cell_ages)
+
+    def rule_needs_dense(self):
+        # With B0 every empty cell is born, which a sparse representation can't express
+        return 0 in self.rule.birth
+
+    @property
+    def population(self):
+        if self.mode == 'sparse':
+            return len(self.cell_indices)
+        return int(np.count_nonzero(self.grid))
+
+    def to_sparse(self, grid, cell_ages):
+        self.cell_indices, self.cell_states, self.sparse_ages = nonzero_cells(grid, cell_ages)
+        self.grid = self.cell_ages = None
+
+    def to_dense(self):
+        grid = np.zeros(self.num_cells, dtype=int)
+        cell_ages = np.zeros(self.num_cells, dtype=int)
+        grid[self.cell_indices] = self.cell_states
+        cell_ages[self.cell_indices] = self.sparse_ages
+        return grid.reshape(self.ROWS, self.COLS), cell_ages.reshape(self.ROWS, self.COLS)
+
+    def to_arrays(self):
+        if self.mode == 'sparse':
+            return self.to_dense()
+        return self.grid, self.cell_ages
+
+    def nonzero_cells(self):
+        if self.mode == 'sparse':
+            return self.cell_indices, self.cell_states, self.sparse_ages
+        return nonzero_cells(self.grid, self.cell_ages)
+
+    def step(self):
+        if self.mode == 'sparse':
+            self.step_sparse()
+            if len(self.cell_indices) > self.dense_threshold * self.num_cells:
+                self.grid, self.cell_ages = self.to_dense()
+                self.cell_indices = self.cell_states = self.sparse_ages = None
+                self.mode = 'dense'
+                self.switch_count += 1
+        else:
+            neighbor_counts = self.rule.count_neighbors(self.grid)
+            self.grid, self.cell_ages = self.rule.apply(self.grid, neighbor_counts, self.cell_ages)
+            if not self.rule_needs_dense() and np.count_nonzero(self.grid) < self.sparse_threshold * self.num_cells:
+                self.to_sparse(self.grid, self.cell_ages)
+                self.mode = 'sparse'
+                self.switch_count += 1
+
+    def step_sparse(self):
+        live_indices = self.cell_indices if self.rule.num_states == 2 else self.cell_indices[self.cell_states == 1]
+        live_rows, live_cols = np.divmod(live_indices, self.COLS)
+
+        # Every live cell adds one to each of its 8 (wrapped) neighbors
+        neighbor_indices = np.concatenate([
+            ((live_rows + d_row) % self.ROWS) * self.COLS + (live_cols + d_col) % self.COLS
+            for d_row, d_col in self.NEIGHBOR_OFFSETS
+        ])
+        candidates, candidate_counts = np.unique(neighbor_indices, return_counts=True)
+
+        # Cells that can change are the ones with live neighbors plus every non-zero cell
+        # (a live cell with no neighbors can die, a dying cell decays regardless)
+        all_indices = np.union1d(candidates, self.cell_indices)
+        neighbor_counts = np.zeros(len(all_indices), dtype=int)
+        neighbor_counts[np.searchsorted(all_indices, candidates)] = candidate_counts
+        states = np.zeros(len(all_indices), dtype=int)
+        ages = np.zeros(len(all_indices), dtype=int)
+        current_positions = np.searchsorted(all_indices, self.cell_indices)
+        states[current_positions] = self.cell_states
+        ages[current_positions] = self.sparse_ages
+
+        new_states, new_ages = self.rule.apply(states, neighbor_counts, ages)
+        keep = new_states != 0
+        self.cell_indices = all_indices[keep]
+        self.cell_states = new_states[keep]
+        self.sparse_ages = new_ages[keep]
+
+def pattern_grid(rows, cols, pattern_name):
+    # Board with one of the preset patterns in the centre
+    pattern_data = next(patterns[pattern_name] for patterns in PRESET_PATTERNS.values() if pattern_name in patterns)
+    grid = np.zeros((rows, cols), dtype=int)
+    start_row = (rows - pattern_data["height"]) // 2
+    start_col = (cols - pattern_data["width"]) // 2
+    for r, c in pattern_data["pattern"]:
+        grid[start_row + r, start_col + c] = 1
+    return grid
+
+def measure_crossover_density(rule, rows, cols, pattern_name="Acorn", generations=1000):
+    # Run a pattern through its lifecycle and time a sparse and a dense step at every generation.
+    # Clustered patterns have far fewer distinct neighbor cells per live cell than random soup, so
+    # the crossover has to be measured on the real workload. The sparse/dense cost ratio grows
+    # roughly linearly with density; fit it and solve for the density where both cost the same
+    # (extrapolating if the pattern never gets that dense, in which case sparse always wins).
+    rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+    engine = AdaptiveEngine(rule, rows, cols)
+    grid = pattern_grid(rows, cols, pattern_name)
+    cell_ages = grid.copy()
+    densities, ratios = [], []
+    for _ in range(generations):
+        engine.to_sparse(grid, cell_ages)
+        if len(engine.cell_indices) == 0:
+            break
+        start = time.perf_counter()
+        engine.step_sparse()
+        sparse_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        new_grid, new_cell_ages = rule.apply(grid, rule.count_neighbors(grid), cell_ages)
+        dense_seconds = time.perf_counter() - start
+        densities.append(len(engine.cell_indices) / engine.num_cells)
+        ratios.append(sparse_seconds / dense_seconds)
+        grid, cell_ages = new_grid, new_cell_ages
+
+    if len(set(densities)) < 2:
+        return 1.0
+    slope, intercept = np.polyfit(densities, ratios, 1)
+    if slope <= 0:
+        return 1.0 if intercept < 1 else 0.0
+    return float(min(max((1 - intercept) / slope, 0.0), 1.0))
+
+def benchmark_engines(rows, cols, generations, rule=DEFAULT_RULE, pattern_name="Acorn"):
+    # Step a pattern through its lifecycle with the dense path only, the sparse path only and the
+    # adaptive engine, and report throughput for each
+    rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+    grid = pattern_grid(rows, cols, pattern_name)
+
+    crossover_density = measure_crossover_density(rule, rows, cols, pattern_name=pattern_name)
+    print(f"{pattern_name} on {rows}x{cols} ({rule.rule_string}), {generations} generations, "
+          f"measured crossover density {crossover_density:.4f}")
+    results = {}
+    for engine_name, engine_crossover in [("dense", 0.0), ("sparse", float('inf')), ("adaptive", crossover_density)]:
+        engine = AdaptiveEngine(rule, rows, cols, crossover_density=engine_crossover)
+        engine.load(grid, grid.copy())
+        peak_population = engine.population
+        start = time.perf_counter()
+        for _ in range(generations):
+            engine.step()
+            peak_population = max(peak_population, engine.population)
+        elapsed = time.perf_counter() - start
+        results[engine_name] = {"seconds": elapsed, "generations_per_second": generations / elapsed,
+                                "switches": engine.switch_count, "final_grid": engine.to_arrays()[0]}
+        print(f"  {engine_name:>8}: {elapsed:8.3f}s  {generations / elapsed:10.1f} gen/s  "
+              f"peak density {peak_population / (rows * cols):.4f}  switches {engine.switch_count}")
+
+    if not all(np.array_equal(results["dense"]["final_grid"], result["final_grid"]) for result in results.values()):
+        print("  Warning: engines disagree on the final grid!")
+    return results
+
+# Table-driven backend: the next state of every 2x2 block of cells depends only on the 4x4 block
+# around it, so the results for all 65,536 4x4 configurations are precomputed once per rule.
+# Each generation packs the board into 16-bit block indices and resolves them with one gather.
+class BlockLookupEngine:
+    # Bump whenever build_lut's bit layout changes so stale cache files aren't picked up
+    LUT_LAYOUT_VERSION = 1
+
+    def __init__(self, rule, rows, cols, cache_dir=LUT_CACHE_DIR):
+        self.rule = rule
+        self.ROWS, self.COLS = rows, cols
+        self.cache_dir = cache_dir
+        self.lut = None
+        self.lut_rule = None
+        self.grid = None
+        self.cell_ages = None
+
+    def supports(self, rule):
+        # Dying Generations states don't fit in one bit, and an odd board size can't be tiled
+        # with 2x2 blocks without breaking the toroidal wrap
+        return rule.num_states == 2 and self.ROWS % 2 == 0 and self.COLS % 2 == 0
+
+    @staticmethod
+    def build_lut(rule):
+        # Bit (4 * row + col) of a block index is the cell at (row, col) of the 4x4 block
+        indices = np.arange(1 << 16, dtype=np.uint32)
+        blocks = ((indices[:, None] >> np.arange(16, dtype=np.uint32)) & 1).astype(np.uint8).reshape(-1, 4, 4)
+        lut = np.zeros((1 << 16, 2, 2), dtype=np.uint8)
+        for row in range(2):
+            for col in range(2):
+                neighborhood = blocks[:, row:row + 3, col:col + 3]
+                centre = neighborhood[:, 1, 1]
+                neighbor_counts = neighborhood.sum(axis=(1, 2), dtype=np.int64) - centre
+                lut[:, row, col] = rule.table[centre, neighbor_counts]
+        return lut
+
+    def lut_path(self, rule):
+        return os.path.join(self.cache_dir, f"block_lut_v{self.LUT_LAYOUT_VERSION}_{rule.rule_string.replace('/', '_')}.npy")
+
+    def load_lut(self, rule):
+        path = self.lut_path(rule)
+        try:
+            lut = np.load(path)
+            if lut.shape == (1 << 16, 2, 2) and lut.dtype == np.uint8:
+                return lut
+            print(f"Ignoring invalid lookup table cache {path}, rebuilding it.")
+        except FileNotFoundError:
+            pass
+        except (IOError, OSError, ValueError) as e:
+            print(f"Error reading lookup table cache {path}: {e}")
+
+        lut = self.build_lut(rule)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.save(path, lut)
+        except (IOError, OSError) as e:
+            print(f"Error saving lookup table cache to {path}: {e}")
+        return lut
+
+    def step_grid(self, grid):
+        # Wrap one cell around the board so every 2x2 block has its full 4x4 neighborhood
+        padded = np.pad(grid.astype(np.uint16, copy=False), 1, mode='wrap')
+        return self.step_padded(padded).astype(grid.dtype, copy=False)
+
+    def step_padded(self, padded):
+        # Next state of the cells inside a board that already carries a 1 cell halo on every side
+        if self.lut_rule is not self.rule:
+            self.lut = self.load_lut(self.rule)
+            self.lut_rule = self.rule
+
+        rows, cols = padded.shape[0] - 2, padded.shape[1] - 2
+        padded = padded.astype(np.uint16, copy=False)
+        # Pack each run of 4 cells starting at an even column into a nibble, then stack
+        # 4 nibbles from consecutive rows into the 16-bit block index
+        nibbles = (padded[:, 0:cols:2] | (padded[:, 1:cols + 1:2] << 1)
+                   | (padded[:, 2:cols + 2:2] << 2) | (padded[:, 3:cols + 3:2] << 3))
+        block_indices = (nibbles[0:rows:2] | (nibbles[1:rows + 1:2] << 4)
+                         | (nibbles[2:rows + 2:2] << 8) | (nibbles[3:rows + 3:2] << 12))
+
+        # Gather gives (block row, block col, row in block, col in block); interleave back to the board
+        new_blocks = self.lut[block_indices]
+        return new_blocks.transpose(0, 2, 1, 3).reshape(rows, cols)
+
+    def load(self, grid, cell_ages):
+        # Adopted without copying; stepping never modifies the arrays in place
+        self.grid, self.cell_ages = grid, cell_ages
+
+    def step(self):
+        if not self.supports(self.rule):
+            neighbor_counts = self.rule.count_neighbors(self.grid)
+            self.grid, self.cell_ages = self.rule.apply(self.grid, neighbor_counts, self.cell_ages)
+            return
+        new_grid = self.step_grid(self.grid)
+        self.cell_ages = np.where(new_grid == 1, np.where(self.grid == 1, self.cell_ages + 1, 1), 0)
+        self.grid = new_grid
+
+    def to_arrays(self):
+        return self.grid, self.cell_ages
+
+    def nonzero_cells(self):
+        return nonzero_cells(self.grid, self.cell_ages)
+
+def benchmark_block_lookup(sizes=(1024, 4096, 8192), density=0.3, generations=5, rule=DEFAULT_RULE, seed=0):
+    # Compare one generation of the lookup table engine against the scipy convolution on random
+    # square boards, checking that both give the same grid
+    rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+    rng = np.random.default_rng(seed)
+    results = {}
+    start = time.perf_counter()
+    BlockLookupEngine(rule, 2, 2).load_lut(rule)
+    print(f"Lookup table for {rule.rule_string} ready in {time.perf_counter() - start:.3f}s")
+    for size in sizes:
+        grid = (rng.random((size, size)) < density).astype(np.uint8)
+        engine = BlockLookupEngine(rule, size, size)
+        timings = {}
+        for engine_name in ("convolution", "lut"):
+            best = float('inf')
+            for _ in range(generations):
+                start = time.perf_counter()
+                if engine_name == "convolution":
+                    convolution_grid = rule.table[grid, rule.count_neighbors(grid)]
+                else:
+                    lut_grid = engine.step_grid(grid)
+                best = min(best, time.perf_counter() - start)
+            timings[engine_name] = best
+        identical = np.array_equal(convolution_grid, lut_grid)
+        del convolution_grid, lut_grid
+        results[size] = {**timings, "speedup": timings["convolution"] / timings["lut"], "identical": identical}
+        print(f"  {size}x{size}: convolution {timings['convolution']:.4f}s  lut {timings['lut']:.4f}s  "
+              f"speedup {results[size]['speedup']:.1f}x  {'identical' if identical else 'MISMATCH'}")
+    return results
+
+# Disk-backed board for boards larger than RAM. Cells are bit-packed into square tiles stored in
+# two memory-mapped files (current and next generation). A generation streams the tiles through a
+# bounded working set with their 1 cell halos, skipping tiles whose 3x3 tile neighborhood is empty
+# according to an in-memory occupancy index. Mappings are dropped whenever the pages touched since
+# the last drop would exceed the resident memory budget, so peak RSS doesn't grow with the board.
+class TiledBoard:
+    META_FILE = "board.json"
+
+    def __init__(self, path, max_resident_bytes=TILE_MEMORY_BUDGET, cache_dir=LUT_CACHE_DIR):
+        self.path = path
+        meta_path = os.path.join(path, self.META_FILE)
+        with open(meta_path, 'r') as f:
+            try:
+                meta = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid board file {meta_path}: {e}")
+        required_keys = {"rows": int, "cols": int, "tile_size": int, "rule": str, "generation": int, "current": int}
+        if not isinstance(meta, dict):
+            raise ValueError(f"Invalid board file {meta_path}. Data should be a dictionary.")
+        for key, key_type in required_keys.items():
+            if key not in meta:
+                raise ValueError(f"Invalid board file {meta_path}. Missing key: '{key}'.")
+            if not isinstance(meta[key], key_type):
+                raise ValueError(f"Invalid board file {meta_path}. '{key}' should be of type {key_type.__name__}.")
+        self.ROWS, self.COLS = meta["rows"], meta["cols"]
+        self.TILE_SIZE = meta["tile_size"]
+        self.rule = LifeRule(meta["rule"])
+        self.generation = meta["generation"]
+        self.current = meta["current"]
+        self.check_rule(self.rule)
+
+        self.tile_rows = -(-self.ROWS // self.TILE_SIZE)
+        self.tile_cols = -(-self.COLS // self.TILE_SIZE)
+        self.tile_shape = (self.tile_rows, self.tile_cols, self.TILE_SIZE, self.TILE_SIZE // 8)
+        self.tile_bytes = self.TILE_SIZE * self.TILE_SIZE // 8
+        self.occupancy = [np.load(self.occupancy_path(i)) for i in range(2)]
+        self.block_engine = BlockLookupEngine(self.rule, self.TILE_SIZE, self.TILE_SIZE, cache_dir=cache_dir)
+
+        self.scratch_bytes = self.check_budget(self.ROWS, self.COLS, self.TILE_SIZE, max_resident_bytes)
+        self.max_mapped_bytes = max_resident_bytes - self.scratch_bytes
+        self.max_resident_bytes = max_resident_bytes
+        self.boards = [None, None]
+        self.mapped_bytes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def create(cls, path, rows, cols, tile_size=TILE_SIZE, rule=DEFAULT_RULE,
+               max_resident_bytes=TILE_MEMORY_BUDGET, cache_dir=LUT_CACHE_DIR):
+        rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+        cls.check_rule(rule)
+        if tile_size < 8 or tile_size % 8:
+            raise ValueError(f"Tile size must be a positive multiple of 8, got {tile_size}.")
+        if rows < 1 or cols < 1:
+            raise ValueError(f"Board size must be positive, got {rows}x{cols}.")
+        cls.check_budget(rows, cols, tile_size, max_resident_bytes)
+
+        os.makedirs(path, exist_ok=True)
+        tile_rows, tile_cols = -(-rows // tile_size), -(-cols // tile_size)
+        for i in range(2):
+            # Creating the memmap sizes the file; on most filesystems it stays sparse until written
+            board = np.memmap(os.path.join(path, f"board_{i}.bin"), dtype=np.uint8, mode='w+',
+                              shape=(tile_rows, tile_cols, tile_size, tile_size // 8))
+            board.flush()
+            del board
+            np.save(os.path.join(path, f"occupancy_{i}.npy"), np.zeros((tile_rows, tile_cols), dtype=bool))
+        meta = {"rows": rows, "cols": cols, "tile_size": tile_size, "rule": rule.rule_string,
+                "generation": 0, "current": 0}
+        with open(os.path.join(path, cls.META_FILE), 'w') as f:
+            json.dump(meta, f, indent=4)
+        return cls(path, max_resident_bytes=max_resident_bytes, cache_dir=cache_dir)
+
+    @staticmethod
+    def check_budget(rows, cols, tile_size, max_resident_bytes):
+        # Memory that doesn't hold mapped tile pages: scratch for stepping one tile (halo window,
+        # block indices and lookup results), the lookup table, and the occupancy index (two
+        # buffers plus the active array and one np.roll temporary in step()). The rest of the
+        # budget must fit the 9 halo tiles read and the 1 tile written for each tile stepped.
+        num_tiles = -(-rows // tile_size) * -(-cols // tile_size)
+        scratch_bytes = 16 * (tile_size + 4) ** 2 + (1 << 18) + 4 * num_tiles
+        if max_resident_bytes - scratch_bytes < 10 * tile_size * tile_size // 8:
+            raise ValueError(f"A memory budget of {max_resident_bytes} bytes is too small for a {rows}x{cols} "
+                             f"board with {tile_size}x{tile_size} tiles.")
+        return scratch_bytes
+
+    @staticmethod
+    def check_rule(rule):
+        # Tiles are one bit per cell, and skipping empty tiles is only valid if nothing is born from nothing
+        if rule.num_states != 2 or 0 in rule.birth:
+            raise ValueError(f"Tiled boards need a two-state rule without B0, got {rule.rule_string}.")
+
+    def occupancy_path(self, i):
+        return os.path.join(self.path, f"occupancy_{i}.npy")
+
+    def board(self, i):
+        if self.boards[i] is None:
+            self.boards[i] = np.memmap(os.path.join(self.path, f"board_{i}.bin"), dtype=np.uint8,
+                                       mode='r+', shape=self.tile_shape)
+        return self.boards[i]
+
+    def release_mappings(self):
+        # Unmapping drops the touched pages from RSS; dirty pages are written back first
+        for board in self.boards:
+            if board is not None:
+                board.flush()
+        self.boards = [None, None]
+        self.mapped_bytes = 0
+
+    def touch(self, num_bytes):
+        # Keep the mapped pages within budget, rounding every access up to whole pages
+        num_bytes += mmap.PAGESIZE
+        if self.mapped_bytes + num_bytes > self.max_mapped_bytes:
+            self.release_mappings()
+        self.mapped_bytes += num_bytes
+
+    def save(self):
+        for board in self.boards:
+            if board is not None:
+                board.flush()
+        for i in range(2):
+            np.save(self.occupancy_path(i), self.occupancy[i])
+        meta = {"rows": self.ROWS, "cols": self.COLS, "tile_size": self.TILE_SIZE,
+                "rule": self.rule.rule_string, "generation": self.generation, "current": self.current}
+        with open(os.path.join(self.path, self.META_FILE), 'w') as f:
+            json.dump(meta, f, indent=4)
+
+    def close(self):
+        self.save()
+        self.release_mappings()
+
+    def segments(self, start, stop, size):
+        # Split the wrapped range [start, stop) of board rows (or columns) into runs inside one tile,
+        # yielding (offset in range, tile index, first local index, end local index)
+        position = start
+        while position < stop:
+            index = position % size
+            tile, local = divmod(index, self.TILE_SIZE)
+            length = min(self.TILE_SIZE - local, size - index, stop - position)
+            yield position - start, tile, local, local + length
+            position += length
+
+    def read_region(self, row_start, row_stop, col_start, col_stop):
+        # Unpack the (wrapped) region of the current generation, reading only occupied tiles
+        region = np.zeros((row_stop - row_start, col_stop - col_start), dtype=np.uint8)
+        occupancy = self.occupancy[self.current]
+        for out_row, tile_row, row0, row1 in self.segments(row_start, row_stop, self.ROWS):
+            for out_col, tile_col, col0, col1 in self.segments(col_start, col_stop, self.COLS):
+                if not occupancy[tile_row, tile_col]:
+                    continue
+                byte0, byte1 = col0 // 8, (col1 + 7) // 8
+                self.touch((row1 - row0 - 1) * (self.TILE_SIZE // 8) + byte1 - byte0)
+                packed = self.board(self.current)[tile_row, tile_col, row0:row1, byte0:byte1]
+                self.bytes_read += packed.nbytes
+                cells = np.unpackbits(packed, axis=1)
+                region[out_row:out_row + row1 - row0, out_col:out_col + col1 - col0] = \
+                    cells[:, col0 - byte0 * 8:col1 - byte0 * 8]
+        return region
+
+    def write_tile(self, buffer, tile_row, tile_col, packed):
+        self.touch(self.tile_bytes)
+        self.board(buffer)[tile_row, tile_col] = packed
+        self.bytes_written += packed.nbytes
+        self.occupancy[buffer][tile_row, tile_col] = packed.any()
+
+    def tile_extent(self, tile_row, tile_col):
+        row0, col0 = tile_row * self.TILE_SIZE, tile_col * self.TILE_SIZE
+        return row0, col0, min(self.TILE_SIZE, self.ROWS - row0), min(self.TILE_SIZE, self.COLS - col0)
+
+    def set_cells(self, cells, state=1):
+        # Set individual cells of the current generation, grouped so each tile is rewritten once
+        cells_by_tile = {}
+        for r, c in cells:
+            r, c = r % self.ROWS, c % self.COLS
+            cells_by_tile.setdefault((r // self.TILE_SIZE, c // self.TILE_SIZE), []).append((r, c))
+        for (tile_row, tile_col), tile_cells in cells_by_tile.items():
+            row0, col0, height, width = self.tile_extent(tile_row, tile_col)
+            tile = np.zeros((self.TILE_SIZE, self.TILE_SIZE), dtype=np.uint8)
+            tile[:height, :width] = self.read_region(row0, row0 + height, col0, col0 + width)
+            for r, c in tile_cells:
+                tile[r - row0, c - col0] = state
+            self.write_tile(self.current, tile_row, tile_col, np.packbits(tile, axis=1))
+
+    def population(self):
+        population = 0
+        occupied_tiles = np.argwhere(self.occupancy[self.current])
+        for tile_row, tile_col in occupied_tiles:
+            self.touch(self.tile_bytes)
+            population += int(np.bitwise_count(self.board(self.current)[tile_row, tile_col]).sum())
+        return population
+
+    def step(self):
+        start = time.perf_counter()
+        self.bytes_read = self.bytes_written = 0
+        nxt = 1 - self.current
+        occupancy = self.occupancy[self.current]
+        # A tile can only have live cells next generation if it or one of its 8 neighbor tiles has
+        # live cells now; roll the occupancy index to find those (with toroidal wrap)
+        active = np.zeros_like(occupancy)
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                active |= np.roll(occupancy, (d_row, d_col), axis=(0, 1))
+
+        tiles_computed = tiles_skipped = population = 0
+        for tile_row in range(self.tile_rows):
+            for tile_col in range(self.tile_cols):
+                if not active[tile_row, tile_col]:
+                    tiles_skipped += 1
+                    # The next buffer still holds the generation before this one
+                    if self.occupancy[nxt][tile_row, tile_col]:
+                        self.write_tile(nxt, tile_row, tile_col, np.zeros(self.tile_shape[2:], dtype=np.uint8))
+                    continue
+
+                row0, col0, height, width = self.tile_extent(tile_row, tile_col)
+                window = self.read_region(row0 - 1, row0 + height + 1, col0 - 1, col0 + width + 1)
+                if height % 2 or width % 2:
+                    # The block lookup works on 2x2 blocks; extra dead cells beyond the halo don't
+                    # affect the tile's own cells and their results are cropped off
+                    window = np.pad(window, ((0, height % 2), (0, width % 2)))
+                tile = np.zeros((self.TILE_SIZE, self.TILE_SIZE), dtype=np.uint8)
+                tile[:height, :width] = self.block_engine.step_padded(window)[:height, :width]
+                packed = np.packbits(tile, axis=1)
+                if packed.any() or self.occupancy[nxt][tile_row, tile_col]:
+                    self.write_tile(nxt, tile_row, tile_col, packed)
+                # Otherwise the tile is dead and the next buffer already holds a dead tile there
+                population += int(np.bitwise_count(packed).sum())
+                tiles_computed += 1
+
+        self.current = nxt
+        self.generation += 1
+        self.save()
+        elapsed = time.perf_counter() - start
+        return {
+            "generation": self.generation,
+            "seconds": elapsed,
+            "population": population,
+            "tiles_computed": tiles_computed,
+            "tiles_skipped": tiles_skipped,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "io_mb_per_second": (self.bytes_read + self.bytes_written) / 2**20 / elapsed if elapsed > 0 else 0.0,
+        }
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def run_tiled_board(path, generations, size=None, tile_size=None, max_resident_bytes=TILE_MEMORY_BUDGET,
+                    rule=None, pattern_file=None, cache_dir=LUT_CACHE_DIR):
+    # Open (or create and seed) a disk-backed board and step it, reporting I/O and skipped tiles.
+    # Size, tile size, rule and pattern only apply to a new board; None means "not given".
+    rule = rule if rule is None or isinstance(rule, LifeRule) else LifeRule(rule)
+    if os.path.exists(os.path.join(path, TiledBoard.META_FILE)):
+        board = TiledBoard(path, max_resident_bytes=max_resident_bytes, cache_dir=cache_dir)
+        print(f"Opened {board.ROWS}x{board.COLS} board at generation {board.generation} from {path}")
+        if size is not None and tuple(size) != (board.ROWS, board.COLS):
+            print(f"Warning: ignoring board size {size[0]}x{size[1]}, the board in {path} is {board.ROWS}x{board.COLS}.")
+        if tile_size is not None and tile_size != board.TILE_SIZE:
+            print(f"Warning: ignoring tile size {tile_size}, the board in {path} uses {board.TILE_SIZE}.")
+        if rule is not None and rule.rule_string != board.rule.rule_string:
+            print(f"Warning: ignoring rule {rule.rule_string}, the board in {path} uses {board.rule.rule_string}.")
+        if pattern_file is not None:
+            print(f"Warning: ignoring pattern file {pattern_file}, the board in {path} is already seeded.")
+    else:
+        if size is None:
+            raise ValueError(f"No board in {path}; give a board size to create one.")
+        rows, cols = size
+        if pattern_file is not None:
+            with open(pattern_file, 'r') as f:
+                pattern_data = json.load(f)
+            if not isinstance(pattern_data, dict) or any(key not in pattern_data for key in ("pattern", "width", "height")):
+                raise ValueError(f"Invalid pattern file format in {pattern_file}.")
+            # Like load_grid_from_file, a pattern saved with a rule runs under that rule
+            if "rule" in pattern_data:
+                pattern_rule = LifeRule(pattern_data["rule"])
+                if rule is not None and rule.rule_string != pattern_rule.rule_string:
+                    print(f"Warning: using rule {pattern_rule.rule_string} from {pattern_file} instead of {rule.rule_string}.")
+                rule = pattern_rule
+        else:
+            pattern_data = PRESET_PATTERNS["Methuselahs"]["Acorn"]
+        board = TiledBoard.create(path, rows, cols, tile_size=tile_size if tile_size is not None else TILE_SIZE,
+                                  rule=rule if rule is not None else DEFAULT_RULE,
+                                  max_resident_bytes=max_resident_bytes, cache_dir=cache_dir)
+        start_row = (rows - pattern_data["height"]) // 2
+        start_col = (cols - pattern_data["width"]) // 2
+        board.set_cells((start_row + r, start_col + c) for r, c in pattern_data["pattern"])
+        print(f"Created {rows}x{cols} board with {board.TILE_SIZE}x{board.TILE_SIZE} tiles "
+              f"({board.rule.rule_string}) in {path}")
+
+    total_tiles = board.tile_rows * board.tile_cols
+    for _ in range(generations):
+        stats = board.step()
+        print(f"Gen {stats['generation']}: population {stats['population']}, "
+              f"{stats['tiles_computed']} tiles computed, {stats['tiles_skipped']}/{total_tiles} skipped, "
+              f"read {stats['bytes_read'] / 2**20:.2f} MB, wrote {stats['bytes_written'] / 2**20:.2f} MB, "
+              f"{stats['io_mb_per_second']:.1f} MB/s, {stats['seconds']:.3f}s")
+    board.close()
+    peak = peak_rss_bytes()
+    if peak is not None:
+        print(f"Peak RSS {peak / 2**20:.1f} MB (tile budget {board.max_resident_bytes / 2**20:.1f} MB)")
+    return board
+
 class GameOfLife:
-    def __init__(self, width, height, cell_size, fps):
+    def __init__(self, width, height, cell_size, fps, rule=DEFAULT_RULE, engine="adaptive"):
         self.WIDTH, self.HEIGHT = width, height
         self.CELL_SIZE = cell_size
         self.ROWS, self.COLS = height // cell_size, width // cell_size
         self.FPS = fps
         self.generation = 0  # Track current generation
+        self.rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+        # While engine_synced is set the engine owns the board and self.grid / self.cell_ages are only
+        # built from it when something asks for them
+        self.engine = None
+        self.engine_synced = False
         
         pygame.init()
         # Enable hardware acceleration
@@ -63,6 +805,16 @@ class GameOfLife:
         self.neighbor_counts = np.zeros((self.ROWS, self.COLS), dtype=int)
         # Initialize cell ages array
         self.cell_ages = np.zeros((self.ROWS, self.COLS), dtype=int)
+        # Stepping backend: "dense" always convolves the full grid, "adaptive" switches to a
+        # sparse representation while the board is nearly empty, "lut" uses 4x4 block lookups
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of: {', '.join(ENGINES)}")
+        if engine == "adaptive":
+            self.engine = AdaptiveEngine(self.rule, self.ROWS, self.COLS)
+        elif engine == "lut":
+            self.engine = BlockLookupEngine(self.rule, self.ROWS, self.COLS)
+        else:
+            self.engine = None
 
         # Editor mode and UI
         self.editing_mode = True
@@ -78,7 +830,7 @@ class GameOfLife:
 
         button_y = self.HEIGHT - button_height - margin_bottom
 
-        button_labels = ["Start", "Clear", "Save", "Load", "Load Default", "Library"] # Added "Library"
+        button_labels = ["Start", "Clear", "Save", "Load", "Load Default", "Library", "Rule"] # Added "Library"
         num_buttons = len(button_labels)
         total_buttons_width = (num_buttons * button_width) + ((num_buttons - 1) * button_padding)
         start_x_buttons = (self.WIDTH - total_buttons_width) // 2
@@ -107,25 +859,65 @@ class GameOfLife:
 
         return grid
 
+    @property
+    def grid(self):
+        self.sync_from_engine()
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        self.sync_from_engine()
+        self._grid = grid
+
+    @property
+    def cell_ages(self):
+        self.sync_from_engine()
+        return self._cell_ages
+
+    @cell_ages.setter
+    def cell_ages(self, cell_ages):
+        self.sync_from_engine()
+        self._cell_ages = cell_ages
+
+    def sync_from_engine(self):
+        # Hand the board back as dense arrays. The caller may edit them in place,
+        # so the engine reloads them before its next step.
+        if self.engine_synced:
+            self._grid, self._cell_ages = self.engine.to_arrays()
+            self.engine_synced = False
+
+    def nonzero_cells(self):
+        # Read-only view of the board that doesn't take it away from the engine
+        if self.engine_synced:
+            return self.engine.nonzero_cells()
+        return nonzero_cells(self._grid, self._cell_ages)
+
+    def board_key(self):
+        # Compact representation of the board for stable and periodic state detection
+        cell_indices, cell_states, _ = self.nonzero_cells()
+        return cell_indices.tobytes() + cell_states.tobytes()
+
     def draw_grid(self):
-        self.screen.fill((0, 0, 0))
-        for row in range(self.ROWS):
-            for col in range(self.COLS):
-                if self.grid[row, col] == 1:
-                    age = self.cell_ages[row, col]
-                    if age == 1:
-                        color = (0, 255, 0)  # Bright green for newborn
-                    elif age == 2:
-                        color = (255, 255, 0)  # Yellow for young
-                    elif age == 3:
-                        color = (255, 165, 0)  # Orange for mature
-                    elif age == 4:
-                        color = (255, 0, 0)  # Red for old
-                    else:
-                        color = (128, 0, 128)  # Purple for very old
+        self.screen.fill((0, 0, 0))  # Black for dead cells
+        cell_indices, cell_states, cell_ages = self.nonzero_cells()
+        rows, cols = np.divmod(cell_indices, self.COLS)
+        for row, col, state, age in zip(rows.tolist(), cols.tolist(), cell_states.tolist(), cell_ages.tolist()):
+            if state == 1:
+                if age == 1:
+                    color = (0, 255, 0)  # Bright green for newborn
+                elif age == 2:
+                    color = (255, 255, 0)  # Yellow for young
+                elif age == 3:
+                    color = (255, 165, 0)  # Orange for mature
+                elif age == 4:
+                    color = (255, 0, 0)  # Red for old
                 else:
-                    color = (0, 0, 0)  # Black for dead cells
-                pygame.draw.rect(self.screen, color, (col * self.CELL_SIZE, row * self.CELL_SIZE, self.CELL_SIZE, self.CELL_SIZE), 0)
+                    color = (128, 0, 128)  # Purple for very old
+            else:
+                # Dying cell in a Generations rule: fade out as it approaches the dead state
+                fade = 1 - (state - 1) / (self.rule.num_states - 1)
+                color = (0, int(40 + 120 * fade), int(80 + 140 * fade))
+            pygame.draw.rect(self.screen, color, (col * self.CELL_SIZE, row * self.CELL_SIZE, self.CELL_SIZE, self.CELL_SIZE), 0)
 
         if self.editing_mode and self.placing_pattern_mode and self.current_pattern_data and self.pattern_preview_pos:
             pattern_cells = self.current_pattern_data['pattern']
@@ -143,47 +935,45 @@ class GameOfLife:
                     pygame.draw.rect(self.screen, (100, 100, 150), cell_rect)  # Solid light blue/purple for preview
 
 
-    def update_neighbor_counts(self):
-        # Use convolution to efficiently calculate neighbor counts
-        kernel = np.array([[1, 1, 1],
-                           [1, 0, 1],
-                           [1, 1, 1]], dtype=int)
-        self.neighbor_counts = scipy.signal.convolve2d(self.grid, kernel, mode='same', boundary='wrap')
+    def set_rule(self, rule):
+        self.rule = rule if isinstance(rule, LifeRule) else LifeRule(rule)
+        # Dying states that don't exist in the new rule become dead cells
+        self.grid[self.grid >= self.rule.num_states] = 0
+        self.cell_ages[self.grid != 1] = 0
+        if self.engine is not None:
+            self.engine.rule = self.rule
 
-    def update_grid(self):
-        self.update_neighbor_counts()  # Populate self.neighbor_counts
+    def update_neighbor_counts(self):
+        self.neighbor_counts = self.rule.count_neighbors(self.grid)
 
-        new_grid = np.zeros_like(self.grid) # Initialize new_grid as a NumPy array of zeros
+    def step_generation(self):
+        # Advance the board by one generation, leaving it with the engine so no dense arrays
+        # are built unless something asks for self.grid or self.cell_ages
+        if self.engine is None:
+            self.grid = self.update_grid()
+            return
+        if not self.engine_synced:
+            self.engine.load(self._grid, self._cell_ages)
+            self.engine_synced = True
+        # The engines don't populate self.neighbor_counts
+        self.engine.step()
+        self._grid = self._cell_ages = None
 
-        for row in range(self.ROWS):
-            for col in range(self.COLS):
-                current_cell_state = self.grid[row, col] # Use tuple indexing for NumPy arrays
-                num_neighbors = self.neighbor_counts[row, col]
+    def update_grid(self):
+        if self.engine is not None:
+            # Like the dense path this only advances the cell ages; the caller assigns the new grid
+            current_grid = self.grid
+            self.step_generation()
+            new_grid = self.grid
+            self._grid = current_grid
+            return new_grid
 
-                if current_cell_state == 1:  # Alive cell
-                    if num_neighbors < 2 or num_neighbors > 3:
-                        new_grid[row, col] = 0  # Dies
-                    else:
-                        new_grid[row, col] = 1  # Survives
-                else:  # Dead cell
-                    if num_neighbors == 3:
-                        new_grid[row, col] = 1  # Becomes alive
-                    else:
-                        new_grid[row, col] = 0  # Stays dead
+        self.update_neighbor_counts()  # Populate self.neighbor_counts
 
         # Update cell ages based on the transition from self.grid to new_grid
-        next_cell_ages = np.zeros_like(self.cell_ages)
-        for row in range(self.ROWS):
-            for col in range(self.COLS):
-                if new_grid[row, col] == 1:  # Cell is alive in new_grid
-                    if self.grid[row, col] == 1:  # Cell was also alive in current self.grid (it aged)
-                        next_cell_ages[row, col] = self.cell_ages[row, col] + 1
-                    else:  # Cell was dead and just became alive (newborn)
-                        next_cell_ages[row, col] = 1
-                # If new_grid[row, col] == 0, age remains 0 (already initialized by np.zeros_like)
-        self.cell_ages = next_cell_ages
-        
-        return new_grid # new_grid is already a NumPy array
+        new_grid, self.cell_ages = self.rule.apply(self.grid, self.neighbor_counts, self.cell_ages)
+
+        return new_grid
 
     def save_grid_to_file(self, filename):
         live_cells = []
@@ -212,7 +1002,8 @@ class GameOfLife:
             "name": "user_saved_pattern", # Placeholder name
             "pattern": relative_pattern_cells,
             "width": pattern_width,
-            "height": pattern_height
+            "height": pattern_height,
+            "rule": self.rule.rule_string
         }
 
         try:
@@ -247,6 +1038,13 @@ class GameOfLife:
             if not isinstance(loaded_data["height"], int):
                 print(f"Error: Invalid pattern file format in {filename}. 'height' should be an integer.")
                 return
+            # Pattern files saved before rules were configurable have no "rule" key and keep the current rule
+            if "rule" in loaded_data:
+                try:
+                    self.set_rule(loaded_data["rule"])
+                except ValueError as e:
+                    print(f"Error: Invalid pattern file format in {filename}. {e}")
+                    return
 
             # Store pattern data and enter placement mode
             self.current_pattern_data = loaded_data
@@ -324,6 +1122,10 @@ class GameOfLife:
                 if item_y_offset + item_height > self.PATTERN_LIBRARY_AREA_RECT.bottom - 10: # Check again for category overflow
                     break
 
+        rule_surf = self.button_font.render(f"Rule: {self.rule.rule_string}", True, text_color)
+        rule_rect = rule_surf.get_rect(centerx=self.WIDTH // 2, bottom=self.buttons[0]['rect'].top - 10)
+        self.screen.blit(rule_surf, rule_rect)
+
         if self.editing_mode and self.placing_pattern_mode and self.current_pattern_data:
             pattern_name = self.current_pattern_data.get("name", "Unnamed Pattern")
             placement_text = f"Placing: {pattern_name}. Left-click: place. Right-click/Esc: cancel."
@@ -443,7 +1245,7 @@ class GameOfLife:
                                         self.generation = 0
                                         self.stable_count = 0
                                         self.stable_generation = None
-                                        previous_grids = [str(self.grid.tolist())]
+                                        previous_grids = [self.board_key()]
                                         self.cell_ages[ (self.grid == 1) & (self.cell_ages == 0) ] = 1
                                     elif action == 'clear':
                                         self.grid.fill(0)
@@ -490,6 +1292,15 @@ class GameOfLife:
                                         if self.show_pattern_library:
                                             self.placing_pattern_mode = False # Cancel placement when opening library
                                             self.current_pattern_data = None
+                                    elif action == 'rule':
+                                        # Cycle through the preset rules
+                                        preset_rules = list(RULE_PRESETS.values())
+                                        if self.rule.rule_string in preset_rules:
+                                            next_index = (preset_rules.index(self.rule.rule_string) + 1) % len(preset_rules)
+                                        else:
+                                            next_index = 0
+                                        self.set_rule(preset_rules[next_index])
+                                        print(f"Rule set to {self.rule.rule_string}.")
                                     break # Exit button loop
 
                         if not button_clicked_in_editor and not self.placing_pattern_mode:
@@ -532,34 +1343,32 @@ class GameOfLife:
 
                 self.draw_grid()
                 # Display generation number on top of the grid
-                gen_text_surf = self.font.render(f"Generation: {self.generation}", True, (255, 255, 255))
+                gen_text_surf = self.font.render(f"Generation: {self.generation}  Rule: {self.rule.rule_string}", True, (255, 255, 255))
                 self.screen.blit(gen_text_surf, (10, 10))
                 pygame.display.flip()
 
-                previous_grid_state = np.copy(self.grid)
-                # update_grid also updates self.cell_ages for the new state
-                new_grid_array = self.update_grid()
+                previous_board_key = self.board_key()
+                # step_generation also updates the cell ages for the new state
+                self.step_generation()
+                current_board_key = self.board_key()
 
-                if np.array_equal(new_grid_array, previous_grid_state):
+                if current_board_key == previous_board_key:
                     self.stable_count += 1
                 else:
                     self.stable_count = 0
 
-                self.grid = new_grid_array
-
                 if self.stable_count >= 10:
                     print("Stable state reached at generation:", self.generation)
                     self.stable_generation = self.generation
                     running = False # Ends simulation loop
                     end_reason = "Stable state"
                 elif self.generation > 20:
-                    current_grid_str = str(self.grid.tolist())
-                    if current_grid_str in previous_grids:
+                    if current_board_key in previous_grids:
                         print("Periodic grid reached at generation:", self.generation)
                         running = False # Ends simulation loop
                         end_reason = "Periodic state"
                     else:
-                        previous_grids.append(current_grid_str)
+                        previous_grids.append(current_board_key)
                     if len(previous_grids) > 10:
                         previous_grids.pop(0)
 
@@ -597,6 +1406,34 @@ class GameOfLife:
         pygame.quit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conway's Game of Life screensaver")
+    parser.add_argument("--rule",
+                        help=f"Life-like rule in B/S notation (default: {DEFAULT_RULE}), e.g. B36/S23 or B2/S345/C4, or a preset name: "
+                             + ", ".join(RULE_PRESETS))
+    parser.add_argument("--engine", choices=ENGINES, default="adaptive",
+                        help="Stepping backend (default: adaptive sparse/dense, lut: 4x4 block lookup table)")
+    parser.add_argument("--benchmark", type=int, metavar="GENERATIONS",
+                        help="Benchmark the stepping backends on an Acorn for this many generations and exit")
+    parser.add_argument("--benchmark-lut", action="store_true",
+                        help="Benchmark the lookup table engine against the convolution at 1k, 4k and 8k and exit")
+    parser.add_argument("--tiled-board", metavar="DIR",
+                        help="Step a disk-backed board stored in DIR without opening a window, then exit")
+    parser.add_argument("--tiled-size", metavar="ROWSxCOLS",
+                        help="Size of the disk-backed board to create if DIR doesn't hold one yet")
+    parser.add_argument("--tiled-pattern", metavar="FILE",
+                        help="Pattern file to seed a new disk-backed board with (default: Acorn)")
+    parser.add_argument("--generations", type=int, default=100,
+                        help="Generations to step the disk-backed board (default: 100)")
+    parser.add_argument("--tile-size", type=int,
+                        help=f"Tile size of a new disk-backed board, a multiple of 8 (default: {TILE_SIZE})")
+    parser.add_argument("--max-memory-mb", type=int, default=TILE_MEMORY_BUDGET // 2**20,
+                        help=f"Memory budget for the tiles of a disk-backed board (default: {TILE_MEMORY_BUDGET // 2**20})")
+    args = parser.parse_args()
+    try:
+        rule = LifeRule(args.rule if args.rule is not None else DEFAULT_RULE)
+    except ValueError as e:
+        parser.error(str(e))
+
     # Set up the dimensions of the window
     width = 2160
     height = 1920
@@ -604,6 +1441,30 @@ if __name__ == "__main__":
     pixel_size= 7
     frame_rate = 74.97
 
+    if args.benchmark:
+        benchmark_engines(height // pixel_size, width // pixel_size, args.benchmark, rule=rule)
+        raise SystemExit
+    if args.benchmark_lut:
+        benchmark_block_lookup(rule=rule)
+        raise SystemExit
+    if args.tiled_board:
+        tiled_size = None
+        if args.tiled_size:
+            try:
+                tiled_size = tuple(int(n) for n in args.tiled_size.lower().split("x"))
+            except ValueError:
+                tiled_size = None
+            if tiled_size is None or len(tiled_size) != 2:
+                parser.error(f"Invalid --tiled-size {args.tiled_size!r}, expected ROWSxCOLS.")
+        try:
+            run_tiled_board(args.tiled_board, args.generations, size=tiled_size, tile_size=args.tile_size,
+                            max_resident_bytes=args.max_memory_mb * 2**20,
+                            rule=rule if args.rule is not None else None,
+                            pattern_file=args.tiled_pattern)
+        except (ValueError, IOError, OSError) as e:
+            parser.error(str(e))
+        raise SystemExit
+
     #Provide the parameters for simulation
-    game = GameOfLife(width, height, pixel_size, frame_rate)
+    game = GameOfLife(width, height, pixel_size, frame_rate, rule=rule, engine=args.engine)
     game.run_simulation()
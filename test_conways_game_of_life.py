@@ -1,8 +1,10 @@
 import unittest
+import unittest.mock
 import numpy as np
 import os
 import json
-from conways_game_of_life import GameOfLife # Assuming the main file is conways_game_of_life.py
+import tempfile
+from conways_game_of_life import GameOfLife, LifeRule, AdaptiveEngine, BlockLookupEngine, TiledBoard, run_tiled_board # Assuming the main file is conways_game_of_life.py
 
 class TestGameOfLife(unittest.TestCase):
 
@@ -135,5 +137,314 @@ class TestGameOfLife(unittest.TestCase):
         self.assertEqual(self.game.grid[3,2], 0, "Cell should die at (3,2).")
         self.assertEqual(self.game.cell_ages[3,2], 0, "Dead cell at (3,2) should have age 0.")
 
+    def test_rule_parsing(self):
+        rule = LifeRule("b36/s23")
+        self.assertEqual(rule.birth, {3, 6})
+        self.assertEqual(rule.survive, {2, 3})
+        self.assertEqual(rule.num_states, 2)
+        self.assertEqual(rule.rule_string, "B36/S23", "Rule string should be normalised.")
+
+        self.assertEqual(LifeRule("Brian's Brain").rule_string, "B2/S/C3", "Preset names should resolve to notation.")
+        self.assertEqual(LifeRule("B2/S345/C4").table.shape, (4, 9))
+
+        for invalid_rule in ["", "B3", "B39/S23", "B3/S23/C1", "X3/S23", "B3/B4/S23", "B3/S23/C3/C5", "B3/S23/C3/G3",
+                             ["B3", "S23"], None]:
+            with self.assertRaises(ValueError, msg=f"Rule {invalid_rule!r} should be rejected."):
+                LifeRule(invalid_rule)
+
+    def test_conway_rule_table(self):
+        # The default rule table must reproduce the classic B3/S23 transitions
+        table = self.game.rule.table
+        for num_neighbors in range(9):
+            self.assertEqual(table[0, num_neighbors], 1 if num_neighbors == 3 else 0)
+            self.assertEqual(table[1, num_neighbors], 1 if num_neighbors in (2, 3) else 0)
+
+    def test_highlife_replicator_birth(self):
+        # Under HighLife a dead cell with 6 neighbors is born; under Conway it stays dead
+        self.game.grid.fill(0)
+        self.game.grid[1, 1:4] = 1
+        self.game.grid[3, 1:4] = 1
+        self.game.cell_ages.fill(0)
+        self.game.cell_ages[self.game.grid == 1] = 1
+
+        conway_grid = self.game.update_grid()
+        self.assertEqual(conway_grid[2, 2], 0, "Conway: 6 neighbors should not give birth.")
+
+        self.game.set_rule("HighLife")
+        highlife_grid = self.game.update_grid()
+        self.assertEqual(highlife_grid[2, 2], 1, "HighLife: 6 neighbors should give birth.")
+        self.assertEqual(self.game.cell_ages[2, 2], 1, "Newly born cell should have age 1.")
+
+    def test_generations_decay(self):
+        # Brian's Brain: live cells never survive, they go through one dying state before dying
+        self.game.set_rule("B2/S/C3")
+        self.game.grid.fill(0)
+        self.game.grid[5, 5] = 1
+        self.game.grid[5, 6] = 1
+        self.game.cell_ages.fill(0)
+        self.game.cell_ages[self.game.grid == 1] = 1
+
+        self.game.grid = self.game.update_grid()
+        self.assertEqual(self.game.grid[5, 5], 2, "Live cell should start dying.")
+        self.assertEqual(self.game.cell_ages[5, 5], 0, "Dying cell should have age 0.")
+        self.assertEqual(self.game.grid[4, 5], 1, "Cell with 2 live neighbors should be born.")
+
+        self.game.grid = self.game.update_grid()
+        self.assertEqual(self.game.grid[5, 5], 0, "Dying cell should be dead after the last dying state.")
+
+        # Switching back to a two-state rule clears the dying states
+        self.game.set_rule("B3/S23")
+        self.assertLess(self.game.grid.max(), 2)
+
+    def test_rule_saved_and_loaded(self):
+        test_filename = "test_rule_save_load.json"
+        self.game.set_rule("Day & Night")
+        self.game.grid.fill(0)
+        self.game.grid[3, 3] = 1
+        self.game.save_grid_to_file(test_filename)
+
+        try:
+            with open(test_filename) as f:
+                self.assertEqual(json.load(f)["rule"], "B3678/S34678")
+
+            self.game.set_rule("B3/S23")
+            self.game.load_grid_from_file(test_filename)
+            self.assertEqual(self.game.rule.rule_string, "B3678/S34678", "Rule should be restored from file.")
+        finally:
+            if os.path.exists(test_filename):
+                os.remove(test_filename)
+
+    def test_adaptive_engine_matches_dense(self):
+        # A random soup decays from dense to sparse, so the engine has to switch representation
+        rng = np.random.default_rng(42)
+        for rule in [LifeRule("B3/S23"), LifeRule("B2/S345/C4")]:
+            grid = (rng.random((self.game.ROWS, self.game.COLS)) < 0.3).astype(int)
+            cell_ages = grid.copy()
+            engine = AdaptiveEngine(rule, self.game.ROWS, self.game.COLS, crossover_density=0.1)
+            engine.load(grid, cell_ages)
+            self.assertEqual(engine.mode, 'dense')
+
+            modes = set()
+            for _ in range(150):
+                grid, cell_ages = rule.apply(grid, rule.count_neighbors(grid), cell_ages)
+                engine.step()
+                modes.add(engine.mode)
+                engine_grid, engine_ages = engine.to_arrays()
+                self.assertTrue(np.array_equal(engine_grid, grid), f"{rule}: engine grid should match dense step.")
+                self.assertTrue(np.array_equal(engine_ages, cell_ages), f"{rule}: engine ages should match dense step.")
+            self.assertEqual(modes, {'dense', 'sparse'}, f"{rule}: engine should have used both representations.")
+
+    def test_adaptive_engine_hysteresis(self):
+        # Blocks are still lifes, so the density only changes when the board is reloaded
+        def board_with_blocks(num_blocks):
+            grid = np.zeros((10, 10), dtype=int)
+            for r, c in [(0, 0), (0, 5), (5, 0), (5, 5)][:num_blocks]:
+                grid[r:r + 2, c:c + 2] = 1
+            return grid
+
+        # Crossover 0.1 with a band from 0.05 to 0.15
+        engine = AdaptiveEngine(self.game.rule, 10, 10, crossover_density=0.1, hysteresis=0.5)
+        grid = board_with_blocks(2) # Density 0.08, below the crossover
+        engine.load(grid, grid.copy())
+        self.assertEqual(engine.mode, 'sparse')
+
+        grid = board_with_blocks(3) # Density 0.12, above the crossover but inside the band
+        engine.load(grid, grid.copy())
+        engine.step()
+        self.assertEqual(engine.mode, 'sparse', "Engine shouldn't switch inside the hysteresis band.")
+
+        grid = board_with_blocks(4) # Density 0.16, above the band
+        engine.load(grid, grid.copy())
+        self.assertEqual(engine.mode, 'sparse', "Reloading should keep the current representation.")
+        engine.step()
+        self.assertEqual(engine.mode, 'dense')
+
+        grid = board_with_blocks(2)
+        engine.load(grid, grid.copy())
+        engine.step()
+        self.assertEqual(engine.mode, 'dense', "Engine shouldn't switch back inside the hysteresis band.")
+
+        grid = board_with_blocks(1) # Density 0.04, below the band
+        engine.load(grid, grid.copy())
+        engine.step()
+        self.assertEqual(engine.mode, 'sparse')
+        self.assertEqual(engine.switch_count, 2)
+        self.assertTrue(np.array_equal(engine.to_arrays()[0], grid))
+
+    def test_engine_keeps_board_between_generations(self):
+        self.game.grid.fill(0)
+        self.game.grid[2, 1:4] = 1 # Horizontal blinker
+        self.game.cell_ages.fill(0)
+        self.game.cell_ages[self.game.grid == 1] = 1
+        initial_pattern = np.copy(self.game.grid)
+        initial_key = self.game.board_key()
+
+        self.game.step_generation()
+        self.assertNotEqual(self.game.board_key(), initial_key, "Blinker should change after 1 gen.")
+        self.game.step_generation()
+        self.assertTrue(self.game.engine_synced, "Engine should own the board between generations.")
+        self.assertIsNone(self.game._grid, "Dense arrays shouldn't be built while stepping.")
+        self.assertEqual(self.game.board_key(), initial_key, "Blinker should return to initial state after 2 gens.")
+
+        # Reading the board hands it back; an edit is picked up by the next generation
+        self.assertTrue(np.array_equal(self.game.grid, initial_pattern))
+        self.assertTrue(np.array_equal(self.game.cell_ages[2, 1:4], [1, 3, 1]))
+        self.assertFalse(self.game.engine_synced)
+        self.game.grid[2, 1:4] = 0
+        self.game.cell_ages[2, 1:4] = 0
+        self.game.step_generation()
+        self.assertEqual(self.game.grid.sum(), 0, "Edited board should be reloaded into the engine.")
+
+    def test_block_lookup_matches_convolution(self):
+        rng = np.random.default_rng(7)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for rule in [LifeRule("B3/S23"), LifeRule("B36/S23"), LifeRule("B3678/S34678")]:
+                engine = BlockLookupEngine(rule, 32, 48, cache_dir=cache_dir)
+                for density in (0.1, 0.4, 0.7):
+                    grid = (rng.random((32, 48)) < density).astype(int)
+                    expected = rule.table[grid, rule.count_neighbors(grid)]
+                    self.assertTrue(np.array_equal(engine.step_grid(grid), expected),
+                                    f"{rule}: lookup table step should match convolution at density {density}.")
+
+    def test_block_lookup_wraps_and_caches(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rule = LifeRule("B3/S23")
+            engine = BlockLookupEngine(rule, 8, 8, cache_dir=cache_dir)
+            # Glider straddling the bottom-right corner of the torus
+            grid = np.zeros((8, 8), dtype=int)
+            for r, c in [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)]:
+                grid[(r + 6) % 8, (c + 6) % 8] = 1
+            engine.load(grid, grid.copy())
+            expected_grid, expected_ages = grid, grid.copy()
+            for _ in range(32): # One full lap of the torus
+                expected_grid, expected_ages = rule.apply(expected_grid, rule.count_neighbors(expected_grid), expected_ages)
+                engine.step()
+                engine_grid, engine_ages = engine.to_arrays()
+                self.assertTrue(np.array_equal(engine_grid, expected_grid))
+                self.assertTrue(np.array_equal(engine_ages, expected_ages))
+            self.assertTrue(np.array_equal(engine_grid, grid), "Glider should be back where it started.")
+
+            self.assertTrue(os.path.exists(engine.lut_path(rule)), "Lookup table should be cached to disk.")
+            self.assertIn(f"_v{BlockLookupEngine.LUT_LAYOUT_VERSION}_", os.path.basename(engine.lut_path(rule)))
+            self.assertTrue(np.array_equal(BlockLookupEngine(rule, 8, 8, cache_dir=cache_dir).load_lut(rule), engine.lut))
+
+    def test_block_lookup_engine_in_game(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.game.engine = BlockLookupEngine(self.game.rule, self.game.ROWS, self.game.COLS, cache_dir=cache_dir)
+            self.game.grid.fill(0)
+            self.game.grid[2, 1:4] = 1 # Horizontal blinker
+            self.game.cell_ages.fill(0)
+            self.game.cell_ages[self.game.grid == 1] = 1
+            initial_pattern = np.copy(self.game.grid)
+
+            self.game.step_generation()
+            self.assertFalse(np.array_equal(self.game.grid, initial_pattern))
+            self.game.step_generation()
+            self.assertTrue(np.array_equal(self.game.grid, initial_pattern))
+            self.assertTrue(np.array_equal(self.game.cell_ages[2, 1:4], [1, 3, 1]))
+
+    def test_block_lookup_falls_back_for_generations(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rule = LifeRule("B2/S/C3")
+            engine = BlockLookupEngine(rule, 8, 8, cache_dir=cache_dir)
+            self.assertFalse(engine.supports(rule))
+            grid = np.zeros((8, 8), dtype=int)
+            grid[3, 3:5] = 1
+            engine.load(grid, grid.copy())
+            engine.step()
+            expected_grid, _ = rule.apply(grid, rule.count_neighbors(grid), grid.copy())
+            self.assertTrue(np.array_equal(engine.to_arrays()[0], expected_grid))
+
+    def test_tiled_board_matches_dense(self):
+        # Board sizes that aren't multiples of the tile size leave ragged tiles at the edges
+        rng = np.random.default_rng(3)
+        rule = LifeRule("B36/S23")
+        with tempfile.TemporaryDirectory() as board_dir:
+            board = TiledBoard.create(board_dir, 50, 44, tile_size=16, rule=rule, max_resident_bytes=1 << 20,
+                                      cache_dir=board_dir)
+            grid = np.zeros((50, 44), dtype=int)
+            grid[:20, :20] = rng.random((20, 20)) < 0.35
+            board.set_cells(map(tuple, np.argwhere(grid)))
+
+            for _ in range(40):
+                grid = rule.table[grid, rule.count_neighbors(grid)]
+                stats = board.step()
+                self.assertTrue(np.array_equal(board.read_region(0, 50, 0, 44), grid))
+                self.assertEqual(stats["population"], grid.sum())
+                self.assertEqual(stats["tiles_computed"] + stats["tiles_skipped"], board.tile_rows * board.tile_cols)
+            board.close()
+
+    def test_tiled_board_skips_empty_tiles(self):
+        with tempfile.TemporaryDirectory() as board_dir:
+            board = TiledBoard.create(board_dir, 64, 64, tile_size=16, max_resident_bytes=1 << 20, cache_dir=board_dir)
+            # A blinker in the middle of tile (1, 1) only activates that tile and its 8 neighbors
+            board.set_cells([(20, 19), (20, 20), (20, 21)])
+            stats = board.step()
+            self.assertEqual(stats["tiles_computed"], 9)
+            self.assertEqual(stats["tiles_skipped"], 16 - 9)
+            # Only the tile the blinker lives in is written; the 8 dead neighbors already are dead on disk
+            self.assertEqual(stats["bytes_written"], board.tile_bytes)
+
+            # When the pattern dies, the stale copy left in the other buffer must be cleared
+            board.set_cells([(20, 20), (19, 20), (21, 20)], state=0)
+            board.step()
+            board.step()
+            self.assertEqual(board.population(), 0)
+            self.assertFalse(board.occupancy[0].any() or board.occupancy[1].any())
+            board.close()
+
+    def test_tiled_board_reopen_and_validation(self):
+        with tempfile.TemporaryDirectory() as board_dir:
+            board = TiledBoard.create(board_dir, 32, 32, tile_size=8, max_resident_bytes=1 << 20, cache_dir=board_dir)
+            board.set_cells([(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)]) # Glider crossing tile boundaries
+            for _ in range(10):
+                board.step()
+            expected = board.read_region(0, 32, 0, 32)
+            board.close()
+
+            reopened = TiledBoard(board_dir, max_resident_bytes=1 << 20, cache_dir=board_dir)
+            self.assertEqual(reopened.generation, 10)
+            self.assertTrue(np.array_equal(reopened.read_region(0, 32, 0, 32), expected))
+            reopened.close()
+
+            with self.assertRaises(ValueError):
+                TiledBoard(board_dir, max_resident_bytes=1024, cache_dir=board_dir)
+
+            # A truncated board file is reported as invalid rather than raising KeyError
+            with open(os.path.join(board_dir, TiledBoard.META_FILE), 'w') as f:
+                json.dump({"rows": 32, "cols": 32}, f)
+            with self.assertRaises(ValueError):
+                TiledBoard(board_dir, cache_dir=board_dir)
+        with tempfile.TemporaryDirectory() as board_dir:
+            # The occupancy index grows with the number of tiles and counts towards the budget,
+            # and the board is rejected before any files are created
+            with self.assertRaises(ValueError):
+                TiledBoard.create(board_dir, 100000, 100000, tile_size=8, max_resident_bytes=64 * 2**20)
+            self.assertEqual(os.listdir(board_dir), [])
+        with tempfile.TemporaryDirectory() as board_dir:
+            for rule, tile_size in [("B2/S/C3", 8), ("B03/S23", 8), ("B3/S23", 12)]:
+                with self.assertRaises(ValueError):
+                    TiledBoard.create(board_dir, 32, 32, tile_size=tile_size, rule=rule)
+
+    def test_run_tiled_board_options(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            pattern_filename = os.path.join(work_dir, "pattern.json")
+            with open(pattern_filename, 'w') as f:
+                json.dump({"pattern": [(0, 0), (0, 1), (1, 0), (1, 1)], "width": 2, "height": 2, "rule": "B36/S23"}, f)
+            board_dir = os.path.join(work_dir, "board")
+
+            # A pattern saved with a rule runs under that rule
+            board = run_tiled_board(board_dir, 1, size=(32, 32), tile_size=16, max_resident_bytes=1 << 20,
+                                    rule="B3/S23", pattern_file=pattern_filename, cache_dir=work_dir)
+            self.assertEqual(board.rule.rule_string, "B36/S23")
+
+            # Options that only apply to new boards are reported when they differ from the stored board
+            with unittest.mock.patch("builtins.print") as mock_print:
+                board = run_tiled_board(board_dir, 1, size=(64, 64), tile_size=8, max_resident_bytes=1 << 20,
+                                        rule="B3/S23", pattern_file=pattern_filename, cache_dir=work_dir)
+            warnings = [call.args[0] for call in mock_print.call_args_list if call.args[0].startswith("Warning")]
+            self.assertEqual(len(warnings), 4, warnings)
+            self.assertEqual((board.ROWS, board.TILE_SIZE, board.rule.rule_string, board.generation), (32, 16, "B36/S23", 2))
+
 if __name__ == '__main__':
     unittest.main()